@@ -6,7 +6,28 @@ class Settings:
     milvus_port: int = int(os.getenv("MILVUS_PORT", "19530"))
     model_dir: str = os.getenv("MODEL_DIR", "/models/all-MiniLM-L6-v2-onnx")
     embedding_dim: int = int(os.getenv("EMBEDDING_DIM", "384"))
-    index_type: str = os.getenv("INDEX_TYPE", "IVF_FLAT")
-    metric_type: str = os.getenv("METRIC_TYPE", "L2")
+    # AUTOINDEX lets Milvus pick; set IVF_FLAT or HNSW to control build knobs
+    index_type: str = os.getenv("INDEX_TYPE", "AUTOINDEX")
+    # IP on unit vectors ranks identically to cosine and lets Milvus use its
+    # SIMD dot-product kernels; matches the text_dense index in milvus_schema
+    metric_type: str = os.getenv("METRIC_TYPE", "IP")
+    # FLOAT16_VECTOR halves vector storage and the memory bandwidth of index
+    # scans; recall loss for MiniLM embeddings is typically <0.5%. Set to
+    # FLOAT_VECTOR to keep FP32 (existing collections keep their schema)
+    dense_vector_type: str = os.getenv("DENSE_VECTOR_TYPE", "FLOAT16_VECTOR")
+    # Opt-in: make intent_entity a partition key so equality filters on it
+    # prune whole partitions before the ANN search (structural schema change,
+    # only affects newly created collections)
+    use_partition_key: bool = os.getenv("MILVUS_PARTITION_KEY", "false").lower() == "true"
+    # Set to 'sq8' to store index vectors scalar-quantized at 1 byte/dim,
+    # quartering the bandwidth of the distance inner loop (IVF_SQ8 / HNSW_SQ);
+    # applies to IVF_FLAT and HNSW index types, not AUTOINDEX
+    milvus_quantize: str = os.getenv("MILVUS_QUANTIZE", "").lower()
+    # Index build / search tuning (ops can trade recall for latency per deploy)
+    nlist: int = int(os.getenv("NLIST", "128"))
+    nprobe: int = int(os.getenv("NPROBE", "10"))
+    hnsw_M: int = int(os.getenv("HNSW_M", "16"))
+    hnsw_efConstruction: int = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+    hnsw_ef: int = int(os.getenv("HNSW_EF", "64"))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import threading
+import time
+from typing import Callable, List
+
+
+class EmbedBatcher:
+    """
+    Coalesce concurrent embed calls into a single batched ONNX run.
+
+    FastAPI executes sync endpoints on a thread pool, so concurrent /query
+    requests arrive on separate threads. The first caller in a window becomes
+    the leader: it waits up to max_wait_ms for more texts (or until max_batch
+    is reached), runs one batched inference, and hands each waiter its vector.
+    This amortizes the fixed ORT dispatch and tokenizer launch cost that a
+    batch=1 run pays per query.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], List[List[float]]],
+                 max_batch: int = 32, max_wait_ms: float = 5.0):
+        self._embed_fn = embed_fn
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000.0
+        self._lock = threading.Lock()
+        self._pending = []
+
+    class _Item:
+        __slots__ = ("text", "result", "error", "event")
+
+        def __init__(self, text):
+            self.text = text
+            self.result = None
+            self.error = None
+            self.event = threading.Event()
+
+    def embed(self, text: str) -> List[float]:
+        """Embed one text, sharing the ONNX run with concurrent callers."""
+        item = self._Item(text)
+        with self._lock:
+            self._pending.append(item)
+            is_leader = len(self._pending) == 1
+        if not is_leader:
+            item.event.wait()
+            if item.error is not None:
+                raise item.error
+            return item.result
+
+        # Leader: give followers a short window to join, then run the batch
+        deadline = time.monotonic() + self._max_wait
+        while True:
+            with self._lock:
+                if len(self._pending) >= self._max_batch:
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.001))
+        with self._lock:
+            batch, self._pending = self._pending, []
+        try:
+            vectors = self._embed_fn([it.text for it in batch])
+            for it, vector in zip(batch, vectors):
+                it.result = vector
+        except Exception as exc:
+            for it in batch:
+                it.error = exc
+        for it in batch:
+            if it is not item:
+                it.event.set()
+        if item.error is not None:
+            raise item.error
+        return item.result
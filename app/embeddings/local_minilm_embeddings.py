@@ -57,10 +57,13 @@ class LocalMiniLMEmbeddings(Embeddings):
         """Generate embeddings for a list of documents."""
         if not texts:
             return []
-        
-        # fastembed returns a generator, so convert to list
-        embeddings = list(self.embedding_model.embed(texts))
-        return embeddings
+
+        # fastembed returns a generator; stream it into a preallocated array
+        # instead of materializing a list of per-document ndarrays
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        for i, vector in enumerate(self.embedding_model.embed(texts)):
+            embeddings[i] = vector
+        return embeddings.tolist()
     
     def embed_query(self, text: str) -> List[float]:
         """Generate embedding for a single query."""
@@ -1,10 +1,14 @@
+import logging
 import os
+import threading
 import numpy as np
 from typing import Any, Dict, List, Optional, Literal
 from tokenizers import Tokenizer
 import onnxruntime as ort
 from langchain_core.embeddings import Embeddings
 
+logger = logging.getLogger(__name__)
+
 class OnnxEmbeddings(Embeddings):
     """
     LangChain Embeddings implementation using ONNX for all-MiniLM-L6-v2 (or compatible).
@@ -21,8 +25,9 @@ class OnnxEmbeddings(Embeddings):
         self,
         model_dir: str,
         embedding_dim: int = 384,
-        provider: Literal["CPU", "CUDA"] = "CPU",
+        provider: Literal["AUTO", "CPU", "CUDA"] = "CPU",
         max_length: int = 256,
+        metric_type: str = "IP",
     ):
         """
         Simplified ONNX embeddings for all-MiniLM-L6-v2 only.
@@ -32,58 +37,188 @@ class OnnxEmbeddings(Embeddings):
         self.model_dir = model_dir
         self.embedding_dim = embedding_dim
         self.max_length = max_length
+        # Normalization only matters for IP (unit vectors make IP rank like
+        # cosine); under L2 the ranking is identical without it, so skip the
+        # extra pass over the embedding tensor
+        self.metric_type = metric_type
 
         # Load tokenizer
         tok_path = os.path.join(model_dir, "tokenizer.json")
         if not os.path.exists(tok_path):
             raise FileNotFoundError(f"Tokenizer not found at {tok_path}")
         self.tokenizer = Tokenizer.from_file(tok_path)
+        # Truncate in the Rust tokenizer so Python never sees over-length sequences
+        self.tokenizer.enable_truncation(max_length)
 
-        # Load ONNX model
-        model_path = os.path.join(model_dir, "model.onnx")
+        # Load ONNX model - prefer the INT8-quantized variant (scripts/quantize.py,
+        # ~4x faster on VNNI-capable CPUs), then FP16 (scripts/convert_fp16.py,
+        # halves memory traffic, tensor cores on CUDA), then plain FP32.
+        for candidate in ("model_quant.onnx", "model_fp16.onnx", "model.onnx"):
+            model_path = os.path.join(model_dir, candidate)
+            if os.path.exists(model_path):
+                break
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"ONNX model not found at {model_path}")
 
         # Setup ONNX Runtime session
-        providers = ["CPUExecutionProvider"]
-        if provider == "CUDA":
-            providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
-        self.session = ort.InferenceSession(model_path, providers=providers)
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Divide cores across uvicorn workers instead of letting every worker
+        # claim all of them (oversubscription thrashes under concurrent load).
+        # ORT_INTRA_OP overrides; WORKERS should match uvicorn --workers.
+        intra_op = int(os.getenv("ORT_INTRA_OP", "0"))
+        if intra_op <= 0:
+            workers = max(1, int(os.getenv("WORKERS", "1")))
+            intra_op = max(1, (os.cpu_count() or 1) // workers)
+        sess_options.intra_op_num_threads = intra_op
+        sess_options.inter_op_num_threads = 1
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # Opt-in ORT profiling for targeted runs (writes a JSON trace per session)
+        if os.getenv("ORT_PROFILE"):
+            sess_options.enable_profiling = True
+        # Pick the provider from the advertised list instead of probing with a
+        # throwaway InferenceSession (loading the graph twice doubles startup cost)
+        available = set(ort.get_available_providers())
+        if provider in ("AUTO", "CUDA") and "CUDAExecutionProvider" in available:
+            # Default CUDA EP options cost several x on transformer graphs:
+            # exhaustive cudnn algo search runs on the first inference, and the
+            # default arena strategy overallocates GPU memory per request
+            cuda_options = {
+                "cudnn_conv_algo_search": "DEFAULT",
+                "do_copy_in_default_stream": True,
+                "arena_extend_strategy": "kSameAsRequested",
+            }
+            if os.getenv("ORT_GPU_MEM_LIMIT"):
+                cuda_options["gpu_mem_limit"] = int(os.getenv("ORT_GPU_MEM_LIMIT"))
+            providers = [("CUDAExecutionProvider", cuda_options), "CPUExecutionProvider"]
+        elif provider == "CUDA":
+            raise RuntimeError("CUDA execution provider requested but not available")
+        else:
+            providers = ["CPUExecutionProvider"]
+        self.session = ort.InferenceSession(model_path, sess_options=sess_options, providers=providers)
+        # On CUDA, route inference through IO binding so inputs are copied to
+        # the device once and the hidden-state output is fetched in a single
+        # device-to-host copy instead of one per session.run output.
+        self._use_iobinding = self.session.get_providers()[0] == "CUDAExecutionProvider"
+        self._output_name = self.session.get_outputs()[0].name
+        # Per-thread arenas for tokenizer outputs, so steady-state embed calls
+        # reuse buffers instead of hitting the allocator (thread-local because
+        # FastAPI may run concurrent requests on different pool threads)
+        self._tokenize_buffers = threading.local()
+        # token_type_ids is always all-zero; keep one zero arena and hand out
+        # reshaped views instead of allocating + zero-filling per call. Never
+        # written, so sharing it across threads is safe.
+        self._token_type_zeros = np.zeros(32 * max_length, dtype=np.int64)
     
+    def _get_buffers(self, batch_size: int, seq_len: int) -> tuple:
+        """Return (input_ids, attention_mask) views into reusable per-thread arenas.
+
+        The arenas are flat so the reshaped [batch, seq_len] views stay
+        C-contiguous regardless of the dynamic padding length; they grow
+        geometrically when a larger batch arrives.
+        """
+        local = self._tokenize_buffers
+        needed = batch_size * seq_len
+        arenas = getattr(local, "arenas", None)
+        if arenas is None or arenas[0].size < needed:
+            capacity = max(needed, 32 * self.max_length)
+            arenas = (np.empty(capacity, dtype=np.int64), np.empty(capacity, dtype=np.int64))
+            local.arenas = arenas
+        return (arenas[0][:needed].reshape(batch_size, seq_len),
+                arenas[1][:needed].reshape(batch_size, seq_len))
+
+    def _token_type_ids(self, batch_size: int, seq_len: int) -> np.ndarray:
+        """Return a [batch, seq_len] all-zero view into the shared zero arena."""
+        needed = batch_size * seq_len
+        zeros = self._token_type_zeros
+        if zeros.size < needed:
+            zeros = np.zeros(needed, dtype=np.int64)
+            self._token_type_zeros = zeros
+        return zeros[:needed].reshape(batch_size, seq_len)
+
+    def _run_model(self, ort_inputs: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """Run the ONNX model and return the last hidden state [batch, seq_len, hidden_dim]."""
+        if self._use_iobinding:
+            io_binding = self.session.io_binding()
+            for name, array in ort_inputs.items():
+                io_binding.bind_cpu_input(name, array)
+            io_binding.bind_output(self._output_name)
+            self.session.run_with_iobinding(io_binding)
+            return io_binding.copy_outputs_to_cpu()[0]
+        # run_with_ort_values hands back OrtValues; converting only the hidden
+        # state we need avoids session.run materializing a NumPy copy per output
+        ort_values = {name: ort.OrtValue.ortvalue_from_numpy(array) for name, array in ort_inputs.items()}
+        outputs = self.session.run_with_ort_values([self._output_name], ort_values)
+        return outputs[0].numpy() if outputs else None
+
     def _tokenize(self, texts: List[str]) -> tuple:
         """Tokenize and pad/truncate for all-MiniLM-L6-v2."""
         batch = self.tokenizer.encode_batch(texts)
-        input_ids = [enc.ids[:self.max_length] + [0] * (self.max_length - len(enc.ids)) for enc in batch]
-        attention_mask = [[1] * min(len(enc.ids), self.max_length) + [0] * (self.max_length - len(enc.ids)) for enc in batch]
-        return np.array(input_ids, dtype=np.int64), np.array(attention_mask, dtype=np.int64)
+        # Pad only to the longest sequence in the batch (the model was exported
+        # with dynamic axes); attention cost grows with seq_len, so short
+        # queries avoid paying for a fixed max_length window. Truncation in
+        # the tokenizer already caps lengths at max_length.
+        seq_len = max(1, max(len(enc.ids) for enc in batch))
+        # Fill row slices of reused arenas instead of building per-row Python
+        # lists (O(batch*seq_len) interpreter work) or reallocating per call.
+        input_ids, attention_mask = self._get_buffers(len(batch), seq_len)
+        input_ids[:] = 0
+        attention_mask[:] = 0
+        for i, enc in enumerate(batch):
+            length = min(len(enc.ids), seq_len)
+            input_ids[i, :length] = enc.ids[:length]
+            attention_mask[i, :length] = 1
+        return input_ids, attention_mask
     
     def _mean_pooling(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
         """Mean pooling to create sentence embeddings."""
         # token_embeddings: [batch, seq_len, hidden_dim]
         # attention_mask: [batch, seq_len]
-        mask_expanded = np.broadcast_to(
-            attention_mask[:, :, None], token_embeddings.shape
-        ).astype(np.float32)
-        
-        sum_embeddings = np.sum(token_embeddings * mask_expanded, axis=1)
-        sum_mask = np.clip(mask_expanded.sum(axis=1), a_min=1e-9, a_max=None)
-        return sum_embeddings / sum_mask
-    
+        # einsum contracts the mask in a single fused pass over the hidden
+        # tensor - no [batch, seq_len, hidden_dim] mask copy is ever built.
+        # Pool in the model's own dtype (FP16 halves the bytes moved here);
+        # the caller upcasts to FP32 before normalization.
+        mask = attention_mask.astype(token_embeddings.dtype)
+        sum_embeddings = np.einsum("bsh,bs->bh", token_embeddings, mask)
+        counts = np.maximum(mask.sum(axis=1, keepdims=True), 1e-9)
+        sum_embeddings /= counts
+        return sum_embeddings
+
     def _normalize(self, embeddings: np.ndarray) -> np.ndarray:
-        """L2 normalize embeddings."""
+        """L2 normalize embeddings in place."""
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
-        return embeddings / norms
+        embeddings /= norms
+        return embeddings
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a list of documents."""
+        return self.embed_documents_np(texts).tolist()
+
+    def embed_documents_np(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings as a [len(texts), dim] float32 array.
+
+        pymilvus serializes ndarrays directly, so callers inserting into
+        Milvus should prefer this over embed_documents to avoid materializing
+        len(texts)*dim Python floats.
+        """
         if not texts:
-            print("[DEBUG] No texts provided to embed_documents.")
-            return []
+            logger.debug("No texts provided to embed_documents.")
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
 
+        # Ingest batches often repeat boilerplate - run the model once per
+        # distinct text and scatter the vectors back into input order
+        unique = {}
+        order = [unique.setdefault(text, len(unique)) for text in texts]
+        if len(unique) < len(texts):
+            return self._embed_batch(list(unique))[order]
+        return self._embed_batch(texts)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Tokenize, run the model and pool a batch of distinct texts."""
         input_ids, attention_mask = self._tokenize(texts)
 
-        # Prepare token_type_ids (all zeros, same shape as input_ids)
-        token_type_ids = np.zeros_like(input_ids, dtype=np.int64)
+        # token_type_ids: all zeros, same shape as input_ids
+        token_type_ids = self._token_type_ids(*input_ids.shape)
 
         # Prepare inputs for the ONNX model
         ort_inputs = {
@@ -91,18 +226,42 @@ class OnnxEmbeddings(Embeddings):
             "attention_mask": attention_mask,
             "token_type_ids": token_type_ids
         }
-        outputs = self.session.run(None, ort_inputs)
-        last_hidden_states = outputs[0] if outputs else None  # [batch, seq_len, hidden_dim]
+        last_hidden_states = self._run_model(ort_inputs)  # [batch, seq_len, hidden_dim]
         if last_hidden_states is None:
-            print("[ERROR] ONNX model did not return outputs.")
-            return []
-        embeddings = self._mean_pooling(last_hidden_states, attention_mask)
-        normalized_embeddings = self._normalize(embeddings)
-        return normalized_embeddings.astype(np.float32).tolist()
-    
+            logger.error("ONNX model did not return outputs.")
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        embeddings = self._mean_pooling(last_hidden_states, attention_mask).astype(np.float32, copy=False)
+        if self.metric_type == "IP":
+            return self._normalize(embeddings)
+        return embeddings
+
     def embed_query(self, text: str) -> List[float]:
         """Generate embedding for a single query."""
-        embeddings = self.embed_documents([text])
-        if not embeddings or not embeddings[0]:
+        return self.embed_query_np(text).tolist()
+
+    def embed_query_np(self, text: str) -> np.ndarray:
+        """Generate embedding for a single query as a 1-D float32 array.
+
+        Fast path: a single sequence needs no padding, so the mask is all-ones
+        and pooling collapses to a plain mean - skips encode_batch, the arena
+        fill and the masked einsum that the batch path pays.
+        """
+        enc = self.tokenizer.encode(text)
+        length = len(enc.ids)
+        if length == 0:
+            # Degenerate input (e.g. empty string) - use the batch path so the
+            # all-masked pooling semantics stay identical
+            return self.embed_documents_np([text])[0]
+        input_ids = np.asarray(enc.ids, dtype=np.int64).reshape(1, length)
+        ort_inputs = {
+            "input_ids": input_ids,
+            "attention_mask": np.ones((1, length), dtype=np.int64),
+            "token_type_ids": self._token_type_ids(1, length),
+        }
+        last_hidden_states = self._run_model(ort_inputs)
+        if last_hidden_states is None:
             raise ValueError("Failed to generate embedding for query: '{}'".format(text))
-        return embeddings[0]
+        embedding = last_hidden_states[0].mean(axis=0, dtype=np.float32)
+        if self.metric_type == "IP":
+            embedding /= np.linalg.norm(embedding) + 1e-12
+        return embedding
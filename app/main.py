@@ -1,3 +1,4 @@
+import gzip
 import os
 import uvicorn
 from fastapi import FastAPI, HTTPException, Path, Query, Body
@@ -8,11 +9,14 @@ from app.schemas import (
     IngestServicesItem,
     QueryRequest,
     QueryResponse,
+    BatchQueryRequest,
+    BatchQueryResponse,
     Hit,
 )
 from app.vectorstore import (
     add_texts_to_collection,
     hybrid_search,
+    hybrid_search_batch,
     HELP_COLLECTION,
     SERVICES_COLLECTION,
     get_embeddings
@@ -20,12 +24,51 @@ from app.vectorstore import (
 
 APP_NAME = os.getenv("APP_NAME", "semantic-search-milvus")
 
+
+class GzipRequestMiddleware:
+    """Transparently decompress gzip-encoded request bodies.
+
+    The bulk ingest CLI compresses its JSON payloads (Content-Encoding: gzip)
+    to cut bytes on the wire; Starlette only handles response compression, so
+    requests are inflated here before they reach the routes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and (b"content-encoding", b"gzip") in scope["headers"]:
+            body = b""
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body", False):
+                    break
+            data = gzip.decompress(body)
+            headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+            headers.append((b"content-length", str(len(data)).encode()))
+            scope = dict(scope, headers=headers)
+            consumed = False
+
+            async def replay_receive():
+                nonlocal consumed
+                if not consumed:
+                    consumed = True
+                    return {"type": "http.request", "body": data, "more_body": False}
+                return await receive()
+
+            await self.app(scope, replay_receive, send)
+            return
+        await self.app(scope, receive, send)
+
 app = FastAPI(
     title=APP_NAME,
     version="0.2.0",
     description="FastAPI service providing semantic search over two Milvus collections using LangChain and Milvus."
 )
 
+app.add_middleware(GzipRequestMiddleware)
+
 # Add CORS middleware for Swagger and cross-origin requests
 from fastapi.middleware.cors import CORSMiddleware
 app.add_middleware(
@@ -36,6 +79,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def warmup():
+    """Pay ORT kernel selection / graph optimization off the request path.
+
+    Runs both the single-query and batch shape paths so the first real /query
+    doesn't eat the first-inference latency.
+    """
+    try:
+        from app.rerank import warmup as rerank_warmup
+        rerank_warmup()
+        embedder = get_embeddings()
+        embedder.embed_query("warmup")
+        embedder.embed_documents(["warmup"] * 8)
+        print("Embedder warmed up")
+    except Exception as e:
+        print(f"Embedder warmup failed (will retry lazily on first request): {e}")
+
+
 @app.post("/hybrid_query", response_model=QueryResponse)
 def hybrid_query(req: QueryRequest):
     if req.collection not in ("help_support", "services"):
@@ -46,7 +107,9 @@ def hybrid_query(req: QueryRequest):
             collection_name=collection_name,
             query_text=req.query,
             k=req.page_size,
-            filter=req.metadata_filter if req.metadata_filter else None
+            filter=req.metadata_filter if req.metadata_filter else None,
+            search_params=req.search_params,
+            offset=(req.page - 1) * req.page_size if req.page > 1 else 0
         )
         # Convert results to our response format
         hits = []
@@ -73,13 +136,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.post("/query/batch", response_model=BatchQueryResponse)
+def query_batch(req: BatchQueryRequest):
+    """Answer several queries against one collection in a single Milvus RPC."""
+    try:
+        collection_name = HELP_COLLECTION if req.collection == "help_support" else SERVICES_COLLECTION
+        per_query = hybrid_search_batch(
+            collection_name=collection_name,
+            query_texts=req.queries,
+            k=req.page_size,
+            filter=req.metadata_filter if req.metadata_filter else None,
+            search_params=req.search_params
+        )
+        results = [[Hit(**hit) for hit in hits] for hits in per_query]
+        return BatchQueryResponse(
+            collection=req.collection,
+            page_size=req.page_size,
+            count=sum(len(hits) for hits in results),
+            results=results,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
 
 
-@app.post("/ingest/{collection}", response_model=dict)
-
 def ingest_help_support(items: List[Dict[str, Any]]) -> dict:
     docs = [IngestHelpSupportItem(**it) for it in items]
     texts = [f"{d.title}\n\n{d.content}" for d in docs]
@@ -136,6 +220,19 @@ def ingest(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Long free-text fields eligible for server-side truncation
+_TRUNCATABLE_FIELDS = ("content", "description", "text")
+
+def _truncate_hits(hits: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Truncate long text fields in place so the response ships fewer bytes."""
+    for hit in hits:
+        for field in _TRUNCATABLE_FIELDS:
+            value = hit.get(field)
+            if isinstance(value, str) and len(value) > limit:
+                hit[field] = value[:limit]
+    return hits
+
+
 @app.post("/query", response_model=QueryResponse)
 def query(req: QueryRequest):
     if req.collection not in ("help_support", "services"):
@@ -143,35 +240,37 @@ def query(req: QueryRequest):
     try:
         collection_name = HELP_COLLECTION if req.collection == "help_support" else SERVICES_COLLECTION
         
+        offset = (req.page - 1) * req.page_size if req.page > 1 else 0
         if req.metadata_filter:
             docs_and_scores = hybrid_search(
                 collection_name=collection_name,
                 query_text=req.query,
                 k=req.page_size,
-                filter=req.metadata_filter
+                filter=req.metadata_filter,
+                search_params=req.search_params,
+                offset=offset,
+                output_fields=req.output_fields
             )
         else:
             docs_and_scores = hybrid_search(
                 collection_name=collection_name,
                 query_text=req.query,
-                k=req.page_size
+                k=req.page_size,
+                search_params=req.search_params,
+                offset=offset,
+                output_fields=req.output_fields
             )
-        
+        if req.truncate:
+            _truncate_hits(docs_and_scores, req.truncate)
+
         # Convert results to our response format
         results = []
-        for doc, score in docs_and_scores:
-            # Create a Hit from document metadata
-            hit_data = {"distance": score}
-            hit_data.update(doc.metadata)
-            
-            # Add document ID based on collection type
-            if req.collection == "help_support":
-                hit_data["id"] = doc.metadata.get("id", None)
-            else:
-                hit_data["service_id"] = doc.metadata.get("service_id", None)
-                
-            results.append(Hit(**hit_data))
-            
+        for hit in docs_and_scores:
+            if req.collection == "services":
+                # services rows are keyed by service_id in the API schema
+                hit = {**hit, "service_id": hit.get("id"), "id": None}
+            results.append(Hit(**hit))
+
         return QueryResponse(
             collection=req.collection,
             page=req.page,
@@ -1,3 +1,5 @@
+import itertools
+from functools import lru_cache
 from pymilvus import MilvusClient
 import os
 
@@ -5,8 +7,20 @@ MILVUS_HOST = os.getenv("MILVUS_HOST", "localhost")
 MILVUS_PORT = int(os.getenv("MILVUS_PORT", "19530"))
 MILVUS_URI = f"http://{MILVUS_HOST}:{MILVUS_PORT}"
 
+# One client = one gRPC channel; under concurrent load a single channel
+# serializes request framing, so allow a small pool (default 1 keeps the old
+# single-connection behavior)
+MILVUS_POOL_SIZE = max(1, int(os.getenv("MILVUS_POOL_SIZE", "1")))
+
+@lru_cache(maxsize=1)
+def _client_pool():
+    """Build the client pool once; each client owns its own gRPC channel."""
+    return itertools.cycle([MilvusClient(uri=MILVUS_URI) for _ in range(MILVUS_POOL_SIZE)])
+
 def get_milvus_client():
-    """Return a singleton MilvusClient for standalone mode (no token)."""
-    if not hasattr(get_milvus_client, "_client"):
-        get_milvus_client._client = MilvusClient(uri=MILVUS_URI)
-    return get_milvus_client._client
+    """Return a MilvusClient for standalone mode (no token), round-robin from the pool.
+
+    MilvusClient caches collection descriptions internally, so reusing pooled
+    instances also avoids re-fetching schema metadata on every request.
+    """
+    return next(_client_pool())
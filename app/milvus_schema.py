@@ -1,15 +1,21 @@
 from pymilvus import DataType, Function, FunctionType
+from app.config import settings
 from app.milvus_client import get_milvus_client
 
 HELP_COLLECTION = "help_support"
 SERVICES_COLLECTION = "services"
 
 
+def dense_vector_datatype():
+    """Datatype for the dense field (FLOAT16_VECTOR halves storage + scan bandwidth)."""
+    return getattr(DataType, settings.dense_vector_type)
+
+
 def create_help_support_schema(client, dim_dense):
     schema = client.create_schema(auto_id=False)
     schema.add_field(field_name="id", datatype=DataType.VARCHAR, is_primary=True, max_length=100)
     schema.add_field(field_name="text", datatype=DataType.VARCHAR, max_length=2000, enable_analyzer=True)
-    schema.add_field(field_name="text_dense", datatype=DataType.FLOAT_VECTOR, dim=dim_dense)
+    schema.add_field(field_name="text_dense", datatype=dense_vector_datatype(), dim=dim_dense)
     schema.add_field(field_name="text_sparse", datatype=DataType.SPARSE_FLOAT_VECTOR)
     schema.add_field(field_name="url", datatype=DataType.VARCHAR, max_length=500)
     schema.add_field(field_name="title", datatype=DataType.VARCHAR, max_length=500)
@@ -28,12 +34,13 @@ def create_services_schema(client, dim_dense):
     schema = client.create_schema(auto_id=False)
     schema.add_field(field_name="id", datatype=DataType.VARCHAR, is_primary=True, max_length=100)
     schema.add_field(field_name="text", datatype=DataType.VARCHAR, max_length=2000, enable_analyzer=True)
-    schema.add_field(field_name="text_dense", datatype=DataType.FLOAT_VECTOR, dim=dim_dense)
+    schema.add_field(field_name="text_dense", datatype=dense_vector_datatype(), dim=dim_dense)
     schema.add_field(field_name="text_sparse", datatype=DataType.SPARSE_FLOAT_VECTOR)
     schema.add_field(field_name="name", datatype=DataType.VARCHAR, max_length=500)
     schema.add_field(field_name="url", datatype=DataType.VARCHAR, max_length=500)
     schema.add_field(field_name="description", datatype=DataType.VARCHAR, max_length=2000)
-    schema.add_field(field_name="intent_entity", datatype=DataType.VARCHAR, max_length=500)
+    schema.add_field(field_name="intent_entity", datatype=DataType.VARCHAR, max_length=500,
+                     is_partition_key=settings.use_partition_key)
     bm25_function = Function(
         name="text_bm25_emb",
         input_field_names=["text"],
@@ -43,6 +50,28 @@ def create_services_schema(client, dim_dense):
     schema.add_function(bm25_function)
     return schema
 
+# Scalar fields that metadata_filter expressions commonly hit; indexed so
+# Milvus prunes candidates before the ANN distance computations instead of
+# substring-scanning every row the graph traversal visits
+FILTER_FIELDS = {
+    HELP_COLLECTION: ("tags",),
+    SERVICES_COLLECTION: ("intent_entity",),
+}
+
+def dense_index_kwargs():
+    """Index type + build params for the dense field, from settings."""
+    sq8 = settings.milvus_quantize == "sq8"
+    if settings.index_type == "IVF_FLAT":
+        return {"index_type": "IVF_SQ8" if sq8 else "IVF_FLAT",
+                "params": {"nlist": settings.nlist}}
+    if settings.index_type == "HNSW":
+        params = {"M": settings.hnsw_M, "efConstruction": settings.hnsw_efConstruction}
+        if sq8:
+            params["sq_type"] = "SQ8"
+            return {"index_type": "HNSW_SQ", "params": params}
+        return {"index_type": "HNSW", "params": params}
+    return {"index_type": "AUTOINDEX"}
+
 def init_hybrid_collection(collection_name, dim_dense, drop_old=False):
     client = get_milvus_client()
     if drop_old and client.has_collection(collection_name):
@@ -55,6 +84,9 @@ def init_hybrid_collection(collection_name, dim_dense, drop_old=False):
     else:
         raise ValueError(f"Unknown collection name: {collection_name}")
     index_params = client.prepare_index_params()
-    index_params.add_index(field_name="text_dense", index_name="text_dense_index", index_type="AUTOINDEX", metric_type="IP")
+    index_params.add_index(field_name="text_dense", index_name="text_dense_index",
+                           metric_type=settings.metric_type, **dense_index_kwargs())
     index_params.add_index(field_name="text_sparse", index_name="text_sparse_index", index_type="SPARSE_INVERTED_INDEX", metric_type="BM25")
+    for field in FILTER_FIELDS.get(collection_name, ()):
+        index_params.add_index(field_name=field, index_name=f"{field}_index", index_type="INVERTED")
     client.create_collection(collection_name=collection_name, schema=schema, index_params=index_params)
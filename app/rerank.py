@@ -0,0 +1,41 @@
+"""
+Client-side score post-processing for search hits.
+
+Numba is optional (it is not a hard dependency of this service); when it is
+installed the hot loop is JIT-compiled with a cached artifact, otherwise a
+pure-NumPy fallback with identical results is used. The FastAPI startup hook
+calls warmup() so the one-time compilation cost never lands on a request.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _rrf(distances: np.ndarray, k: int) -> np.ndarray:
+    """Reciprocal-rank-fusion scores: 1 / (k + rank), best hit first."""
+    order = np.argsort(-distances)
+    scores = np.empty_like(distances)
+    for position in range(order.shape[0]):
+        scores[order[position]] = 1.0 / (k + position + 1)
+    return scores
+
+
+if njit is not None:
+    _rrf = njit(cache=True)(_rrf)
+
+
+def rrf_scores(distances, k: int = 60) -> np.ndarray:
+    """Compute RRF scores for a distance array (higher distance = better hit).
+
+    Useful for fusing or thresholding result lists client-side when the
+    server-side ranker is not applicable.
+    """
+    return _rrf(np.asarray(distances, dtype=np.float64), k)
+
+
+def warmup():
+    """Pay the one-time JIT compilation cost off the request path."""
+    rrf_scores(np.zeros(1))
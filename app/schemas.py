@@ -28,6 +28,15 @@ class QueryRequest(BaseModel):
     metadata_filter: Optional[Dict[str, Any]] = Field(default=None, description="Milvus scalar filter map")
     output_fields: Optional[List[str]] = None
     search_params: Optional[Dict[str, Any]] = Field(default=None, description="Milvus index search params override, e.g. {'nprobe': 16}")
+    truncate: Optional[int] = Field(default=None, description="Truncate long text fields (content/description/text) to this many characters server-side")
+
+
+class BatchQueryRequest(BaseModel):
+    collection: Literal["help_support", "services"]
+    queries: List[str]
+    page_size: int = 5
+    metadata_filter: Optional[Dict[str, Any]] = Field(default=None, description="Milvus scalar filter map")
+    search_params: Optional[Dict[str, Any]] = Field(default=None, description="Milvus index search params override, e.g. {'nprobe': 16}")
 
 
 class Hit(BaseModel):
@@ -49,4 +58,11 @@ class QueryResponse(BaseModel):
     page: int
     page_size: int
     count: int
-    results: List[Hit]
\ No newline at end of file
+    results: List[Hit]
+
+
+class BatchQueryResponse(BaseModel):
+    collection: str
+    page_size: int
+    count: int
+    results: List[List[Hit]]
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Semantic result cache: paraphrase-tolerant LRU over query embeddings.
+
+Exact-match caching (the lru_cache in vectorstore) only helps for identical
+strings; real workloads re-ask the same question in slightly different words.
+Entries store the query's unit embedding alongside its results, and lookups
+return the cached results when the best cosine similarity clears tau.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.vectorstore import _embed_query_cached
+
+
+def _unit_embedding(query: str) -> np.ndarray:
+    embedding = np.asarray(_embed_query_cached(query.strip().lower()), dtype=np.float32)
+    norm = float(np.linalg.norm(embedding))
+    if norm > 0.0:
+        embedding /= norm
+    return embedding
+
+
+class SemanticCache:
+    """Bounded LRU of (embedding, results) pairs, keyed per collection.
+
+    get() stacks the cached embeddings for the collection and computes all
+    cosine similarities in one vectorized matmul; a hit refreshes LRU order.
+    Entries expire after ttl_seconds when set.
+    """
+
+    def __init__(self, capacity: int = 256, tau: float = 0.92,
+                 ttl_seconds: Optional[float] = None):
+        self.capacity = capacity
+        self.tau = tau
+        self.ttl_seconds = ttl_seconds
+        # (collection, query) -> (unit embedding, results, created_at)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, collection: str, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for a semantically similar query, or None."""
+        query_emb = _unit_embedding(query)
+        now = time.time()
+        with self._lock:
+            keys = []
+            embeddings = []
+            for key, (emb, _, created_at) in self._entries.items():
+                if key[0] != collection:
+                    continue
+                if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                    continue
+                keys.append(key)
+                embeddings.append(emb)
+            if not keys:
+                return None
+            sims = np.stack(embeddings) @ query_emb
+            best = int(np.argmax(sims))
+            if sims[best] < self.tau:
+                return None
+            self._entries.move_to_end(keys[best])
+            return self._entries[keys[best]][1]
+
+    def put(self, collection: str, query: str, results: List[Dict[str, Any]]):
+        """Store results under the query's embedding, evicting the LRU entry."""
+        query_emb = _unit_embedding(query)
+        with self._lock:
+            self._entries[(collection, query)] = (query_emb, results, time.time())
+            self._entries.move_to_end((collection, query))
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
@@ -1,7 +1,10 @@
 import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
-from app.embeddings.local_minilm_embeddings import LocalMiniLMEmbeddings
 from pymilvus import AnnSearchRequest, RRFRanker
+from app.config import settings
 from app.milvus_client import get_milvus_client
 
 # Collection names (from env or defaults)
@@ -17,7 +20,13 @@ MILVUS_URI = os.getenv("MILVUS_URI")
 MODEL_DIR = os.getenv("MODEL_DIR", "/home/karthik/projects/ai-models/onnx/all-MiniLM-L6-v2")
 EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
 
-# Default embedding model
+# Bulk inserts above this row count are split and sent in parallel
+INSERT_CHUNK_ROWS = int(os.getenv("INSERT_CHUNK_ROWS", "5000"))
+
+# Default embedding model - built once per process (the ONNX session is far
+# more expensive than a single inference); a failed build is not cached, so
+# the next call retries. The FastAPI startup hook triggers this eagerly.
+@lru_cache(maxsize=1)
 def get_embeddings():
     from app.embeddings.onnx_embeddings import OnnxEmbeddings
     ONNX_PROVIDER = os.getenv("ORT_PROVIDER", "AUTO")  # AUTO | CUDA | CPU
@@ -25,11 +34,8 @@ def get_embeddings():
         model_dir=MODEL_DIR,
         embedding_dim=EMBEDDING_DIM,
         provider=ONNX_PROVIDER,
+        metric_type=os.getenv("METRIC_TYPE", "IP"),
     )
-    # """Get the local all-MiniLM-L6-v2 ONNX model."""
-    # return LocalMiniLMEmbeddings(
-    #     model_dir=MODEL_DIR,
-    # )
 
 def get_connection_args() -> Dict[str, Any]:
     """Get Milvus connection arguments based on environment."""
@@ -43,58 +49,262 @@ def add_texts_to_collection(
     metadatas: Optional[List[Dict[str, Any]]] = None,
     ids: Optional[List[str]] = None,
     dense_embeddings: Optional[List[List[float]]] = None,
-    drop_old: bool = False
+    drop_old: bool = False,
+    batch_size: int = 64
 ) -> List[str]:
-    """Add texts to a specific Milvus collection with dense and sparse fields."""
+    """Add texts to a specific Milvus collection with dense and sparse fields.
+
+    When dense_embeddings is omitted they are computed here, batch_size texts
+    per ONNX run - only the sparse BM25 field is server-generated; callers
+    that skip both would insert rows with no dense vector at all.
+    """
     client = get_milvus_client()
+    # Pack the embedding column into one contiguous buffer in the schema's
+    # dtype up front; per-record values below are row views, not float lists
+    if dense_embeddings is not None:
+        dense = np.asarray(dense_embeddings, dtype=_dense_np_dtype())
+    elif texts:
+        embedder = get_embeddings()
+        dense = np.vstack([
+            embedder.embed_documents_np(texts[i:i + batch_size])
+            for i in range(0, len(texts), batch_size)
+        ]).astype(_dense_np_dtype(), copy=False)
+    else:
+        dense = None
+    row_ids = ids if ids else list(range(len(texts)))
     data = []
     for i, text in enumerate(texts):
         item = {
-            "id": ids[i] if ids else i,
+            "id": row_ids[i],
             "text": text,
-            "text_dense": dense_embeddings[i] if dense_embeddings else None,
+            "text_dense": dense[i] if dense is not None else None,
         }
         if metadatas:
             item.update(metadatas[i])
         data.append(item)
-    client.insert(collection_name=collection_name, data=data)
-    return [str(d["id"]) for d in data]
+    if len(data) > INSERT_CHUNK_ROWS:
+        # Pipeline large loads as parallel chunked inserts - pymilvus releases
+        # the GIL during the gRPC call, so 4 in-flight chunks overlap network
+        # and server-side ingestion without a synchronous flush per batch
+        chunks = [data[i:i + INSERT_CHUNK_ROWS] for i in range(0, len(data), INSERT_CHUNK_ROWS)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda chunk: client.insert(collection_name=collection_name, data=chunk), chunks))
+    else:
+        client.insert(collection_name=collection_name, data=data)
+    return [str(row_id) for row_id in row_ids]
+
+@lru_cache(maxsize=1)
+def _get_embed_batcher():
+    from app.embeddings.batcher import EmbedBatcher
+    return EmbedBatcher(
+        lambda texts: get_embeddings().embed_documents(texts),
+        max_batch=int(os.getenv("EMBED_MAX_BATCH", "32")),
+        max_wait_ms=float(os.getenv("EMBED_MAX_WAIT_MS", "5")),
+    )
+
+# Optional on-disk embedding memo, keyed by sha256 of the query text; spans
+# process restarts (dev reruns of test_queries, rolling server restarts)
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR")
+
+def _disk_cache_path(text: str) -> str:
+    import hashlib
+    return os.path.join(EMBED_CACHE_DIR, hashlib.sha256(text.encode()).hexdigest() + ".npy")
+
+@lru_cache(maxsize=4096)
+def _embed_query_cached(text: str) -> tuple:
+    """Embed a query once and memoize it (tuple so the result is hashable).
+
+    Embeddings are deterministic for a fixed model, so entries never need
+    invalidation; repeated/common queries skip tokenization and the ONNX run.
+    Cache misses go through the batcher so concurrent queries share one run,
+    and optionally through an on-disk memo that survives restarts.
+    """
+    if EMBED_CACHE_DIR:
+        path = _disk_cache_path(text)
+        if os.path.exists(path):
+            return tuple(np.load(path).tolist())
+    vector = tuple(_get_embed_batcher().embed(text))
+    if EMBED_CACHE_DIR:
+        os.makedirs(EMBED_CACHE_DIR, exist_ok=True)
+        np.save(_disk_cache_path(text), np.asarray(vector, dtype=np.float32))
+    return vector
+
+# Single-pass escape table; includes backslash (a value like "a\\'b" would
+# otherwise break out of the quoted literal)
+_EXPR_ESCAPE = str.maketrans({"'": "\\'", "\\": "\\\\"})
+
+def _render_str(value) -> str:
+    return "'" + value.translate(_EXPR_ESCAPE) + "'"
+
+def _render_bool(value) -> str:
+    return "true" if value else "false"
+
+def _render_list(value) -> str:
+    return "[" + ", ".join(_render_expr_value(v) for v in value) + "]"
+
+# Exact-type dispatch table: one dict lookup instead of an isinstance chain
+# (and its MRO walks) per filter value; NumPy scalars register here without
+# widening any isinstance checks. Unlisted types fall back to str().
+_EXPR_RENDERERS = {
+    str: _render_str,
+    bool: _render_bool,
+    int: str,
+    float: str,
+    list: _render_list,
+    tuple: _render_list,
+    np.int32: str,
+    np.int64: str,
+    np.float32: str,
+    np.float64: str,
+}
+
+def _render_expr_value(value) -> str:
+    """Render one filter value as a Milvus expression literal."""
+    return _EXPR_RENDERERS.get(type(value), str)(value)
+
+def _build_expr(filter: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Build a Milvus scalar filter expression from a metadata filter map.
+
+    {'tags': 'faq'} -> "tags == 'faq'"; list values render as membership
+    tests: {'id': ['a', 'b']} -> "id in ['a', 'b']". Parts are joined
+    directly - no %-substitution, so filter keys containing format
+    metacharacters pass through verbatim (Milvus rejects invalid field names
+    itself).
+    """
+    if not filter:
+        return None
+    return " and ".join(
+        f"{key} in {_render_expr_value(value)}" if type(value) in (list, tuple)
+        else f"{key} == {_render_expr_value(value)}"
+        for key, value in filter.items()
+    )
+
+def _dense_np_dtype():
+    """NumPy dtype matching the configured dense vector schema type.
+
+    Embeddings stay FP32 through the model and normalization for accuracy;
+    the cast to FP16 happens only at the Milvus boundary.
+    """
+    return np.float16 if settings.dense_vector_type == "FLOAT16_VECTOR" else np.float32
+
+def dense_search_params() -> Dict[str, Any]:
+    """Query-time tuning params for the dense field, matching the index family."""
+    if settings.index_type == "HNSW":
+        return {"ef": settings.hnsw_ef}
+    return {"nprobe": settings.nprobe}
+
+# Milvus refuses searches whose candidate window exceeds this (server topk cap)
+MAX_SEARCH_WINDOW = 16384
 
-def hybrid_search(collection_name: str, query_text: str, k: int = 4, filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-    """Perform hybrid search using both dense and sparse vectors."""
+def hybrid_search(collection_name: str, query_text: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                  search_params: Optional[Dict[str, Any]] = None, offset: int = 0,
+                  output_fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Perform hybrid search using both dense and sparse vectors.
+
+    search_params overrides the configured dense-index query params per call
+    (e.g. {'nprobe': 16} or {'ef': 128}), the query-time recall/latency lever.
+
+    Pagination: rather than passing offset to Milvus (which over-fetches to
+    limit+offset server-side and allocates the larger candidate heap even for
+    page 1), fetch offset+k results and slice here. First-page requests
+    therefore send no offset at all. offset+k must stay under
+    MAX_SEARCH_WINDOW.
+    """
+    if offset + k > MAX_SEARCH_WINDOW:
+        raise ValueError(f"page window {offset + k} exceeds Milvus top-K cap {MAX_SEARCH_WINDOW}")
     client = get_milvus_client()
     print(f"Performing hybrid search on collection '{collection_name}' with query: {query_text}")
-    # Compute dense embedding from query_text
-    dense_query = get_embeddings().embed_query(query_text)
-    req_dense = AnnSearchRequest(data=[dense_query], anns_field="text_dense", param={"nprobe": 10}, limit=k)
-    req_sparse = AnnSearchRequest(data=[query_text], anns_field="text_sparse", param={"drop_ratio_search": 0.2}, limit=k)
+    # Compute dense embedding from query_text (cache key normalized - MiniLM is
+    # uncased); pymilvus serializes the ndarray without a Python-float detour
+    dense_query = np.asarray(_embed_query_cached(query_text.strip().lower()), dtype=_dense_np_dtype())
+    dense_params = dense_search_params()
+    if search_params:
+        dense_params.update(search_params)
+    expr = _build_expr(filter)
+    window = k + offset
+    req_dense = AnnSearchRequest(data=[dense_query], anns_field="text_dense", param=dense_params, limit=window, expr=expr)
+    req_sparse = AnnSearchRequest(data=[query_text], anns_field="text_sparse", param={"drop_ratio_search": 0.2}, limit=window, expr=expr)
     ranker = RRFRanker(100)
 
-    # Set output_fields based on collection
-    if collection_name == HELP_COLLECTION:
-        output_fields = [
-            "id", "text", "title", "url", "content", "tags"
-        ]
-    elif collection_name == SERVICES_COLLECTION:
-        output_fields = [
-            "id", "text", "name", "url", "description", "intent_entity"
-        ]
-    else:
-        output_fields = ["id", "text"]
+    # Callers can project a subset so Milvus never ships bytes the client
+    # would discard (e.g. long content fields a UI immediately truncates)
+    if output_fields is None:
+        output_fields = _output_fields(collection_name)
+    results = client.hybrid_search(
+        collection_name=collection_name,
+        output_fields=output_fields,
+        reqs=[req_dense, req_sparse],
+        ranker=ranker,
+        limit=window
+    )[0]
+    hits = _format_hits(results, output_fields)
+    return hits[offset:] if offset else hits
+
+def hybrid_search_with_distances(collection_name: str, query_text: str, k: int = 4,
+                                 **kwargs) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """Like hybrid_search, but also return the distances as one float32 array.
+
+    Callers that threshold or re-rank scores (e.g. through app.rerank) get a
+    vectorized array in lockstep with the hits instead of reading the
+    distance back out of each hit dict.
+    """
+    hits = hybrid_search(collection_name, query_text, k=k, **kwargs)
+    return hits, distances_array(hits)
 
+def distances_array(hits: List[Dict[str, Any]]) -> np.ndarray:
+    """Extract hit distances into a float32 array (NaN for missing values)."""
+    return np.fromiter(
+        (hit["distance"] if hit.get("distance") is not None else np.nan for hit in hits),
+        dtype=np.float32, count=len(hits),
+    )
+
+def hybrid_search_batch(collection_name: str, query_texts: List[str], k: int = 4,
+                        filter: Optional[Dict[str, Any]] = None,
+                        search_params: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """Run hybrid search for several queries in a single Milvus RPC.
+
+    Milvus charges ~1 ms of fixed server-side processing per search call;
+    sending all vectors in one hybrid_search amortizes that plus the
+    per-request embedding dispatch. Returns one hit list per query, in order.
+    """
+    if not query_texts:
+        return []
+    client = get_milvus_client()
+    dense_queries = get_embeddings().embed_documents_np([q.strip().lower() for q in query_texts]).astype(_dense_np_dtype(), copy=False)
+    dense_params = dense_search_params()
+    if search_params:
+        dense_params.update(search_params)
+    expr = _build_expr(filter)
+    req_dense = AnnSearchRequest(data=dense_queries, anns_field="text_dense", param=dense_params, limit=k, expr=expr)
+    req_sparse = AnnSearchRequest(data=list(query_texts), anns_field="text_sparse", param={"drop_ratio_search": 0.2}, limit=k, expr=expr)
+    ranker = RRFRanker(100)
+    output_fields = _output_fields(collection_name)
     results = client.hybrid_search(
         collection_name=collection_name,
         output_fields=output_fields,
         reqs=[req_dense, req_sparse],
         ranker=ranker,
         limit=k
-    )[0]
-    hits = []
-
-    for hit in results:
-        print(f"Hybrid search results: {hit}")
-        hit_data = {'distance': getattr(hit, 'distance', None)}
-        for key in output_fields:
-            hit_data[key] = getattr(hit, key, None)
-        hits.append(hit_data)
-    return hits
\ No newline at end of file
+    )
+    return [_format_hits(per_query, output_fields) for per_query in results]
+
+# Per-collection output field specs, frozen at import; adding a collection is
+# a one-line change here instead of another branch in every code path
+COLLECTION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    HELP_COLLECTION: ("id", "text", "title", "url", "content", "tags"),
+    SERVICES_COLLECTION: ("id", "text", "name", "url", "description", "intent_entity"),
+}
+_DEFAULT_FIELDS: Tuple[str, ...] = ("id", "text")
+
+def _output_fields(collection_name: str) -> List[str]:
+    """Output fields to request from Milvus for a collection."""
+    return list(COLLECTION_FIELDS.get(collection_name, _DEFAULT_FIELDS))
+
+def _format_hits(results, output_fields: List[str]) -> List[Dict[str, Any]]:
+    """Convert Milvus hits into plain dicts with distance + output fields.
+
+    Hits are dict-likes; a single comprehension over precomputed keys avoids
+    the per-field __getattr__ -> KeyError round trip of attribute access.
+    """
+    keys = ("distance", *output_fields)
+    return [{key: hit.get(key) for key in keys} for hit in results]
\ No newline at end of file
@@ -70,51 +70,74 @@ CATEGORIES = [
     }
 ]
 
-def generate_help_content():
-    """Generate realistic help content based on banking topics."""
-    # Select a random category
-    category = random.choice(CATEGORIES)
-    
-    # Select a random topic from the category
-    topic = random.choice(category["topics"])
-    
-    # Generate a title based on the topic
-    if random.random() < 0.3:
-        title = f"How to {topic.lower()}"
-    elif random.random() < 0.6:
-        title = f"Understanding your {topic.lower()}"
-    else:
-        title = f"{topic}: Frequently asked questions"
-    
-    # Generate a URL based on the category and topic
-    url_path = f"{category['name'].lower().replace(' & ', '-').replace(' ', '-')}/{topic.lower().replace(' ', '-')}"
-    url = f"https://bank.example.com/help/{url_path}"
-    
-    # Generate ID
-    doc_id = f"help-{fake.unique.random_int(min=100, max=999)}"
-    
-    # Generate content with multiple paragraphs
-    paragraphs = []
-    for _ in range(random.randint(2, 4)):
-        paragraphs.append(fake.paragraph(nb_sentences=random.randint(3, 8)))
-    content = "\n\n".join(paragraphs)
-    
-    # Select tags
-    tags = category["tags"].copy()
-    if random.random() < 0.3:
-        tags.append(random.choice(["faq", "quick help", "getting started", "support"]))
-    
-    return {
-        "id": doc_id,
-        "url": url,
-        "title": title,
-        "content": content,
-        "tags": tags
-    }
+# One Random instance for all draws - the module-level random.* functions
+# route through an extra layer of indirection to a hidden shared instance
+_rng = random.Random()
+
+# Faker's Markov-chain paragraph generation dominates bulk runs; draw from a
+# fixed pool of pre-generated paragraphs instead of generating one per document
+_PARAGRAPH_POOL_SIZE = 1000
+_paragraph_pool = None
+
+EXTRA_TAGS = ["faq", "quick help", "getting started", "support"]
+
+
+def get_paragraph_pool():
+    """Build (once) and return the pool of Faker paragraphs to sample from."""
+    global _paragraph_pool
+    if _paragraph_pool is None:
+        _paragraph_pool = [
+            fake.paragraph(nb_sentences=_rng.randint(3, 8))
+            for _ in range(_PARAGRAPH_POOL_SIZE)
+        ]
+    return _paragraph_pool
+
 
 def generate_help_support_data(count=100):
     """Generate a specified number of help support documents."""
-    return [generate_help_content() for _ in range(count)]
+    pool = get_paragraph_pool()
+    # Bind the Random methods once; every draw below is then a plain local call
+    choice = _rng.choice
+    choices = _rng.choices
+    randint = _rng.randint
+    rand = _rng.random
+    # Draw the per-document randomness vector-wide up front instead of making
+    # several random calls inside the loop
+    categories = choices(CATEGORIES, k=count)
+    title_styles = choices((0, 1, 2), weights=(0.3, 0.3, 0.4), k=count)
+    # Unique ids without Faker's unique-tracking overhead (which also caps out
+    # above ~900 documents): shuffled consecutive ints
+    doc_ids = list(range(100, 100 + count))
+    _rng.shuffle(doc_ids)
+
+    docs = []
+    for category, title_style, doc_id in zip(categories, title_styles, doc_ids):
+        topic = choice(category["topics"])
+
+        if title_style == 0:
+            title = f"How to {topic.lower()}"
+        elif title_style == 1:
+            title = f"Understanding your {topic.lower()}"
+        else:
+            title = f"{topic}: Frequently asked questions"
+
+        url_path = f"{category['name'].lower().replace(' & ', '-').replace(' ', '-')}/{topic.lower().replace(' ', '-')}"
+        url = f"https://bank.example.com/help/{url_path}"
+
+        content = "\n\n".join(choices(pool, k=randint(2, 4)))
+
+        tags = category["tags"].copy()
+        if rand() < 0.3:
+            tags.append(choice(EXTRA_TAGS))
+
+        docs.append({
+            "id": f"help-{doc_id}",
+            "url": url,
+            "title": title,
+            "content": content,
+            "tags": tags
+        })
+    return docs
 
 if __name__ == "__main__":
     # Generate 100 documents
@@ -24,7 +24,36 @@ except ImportError:
 from generate_help_data import generate_help_support_data
 from generate_services_data import generate_services_data
 
-def generate_data():
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def write_records(path, records, jsonl=False):
+    """Write records as a JSON array, or stream NDJSON when jsonl is set.
+
+    NDJSON keeps peak memory at one record (no whole-list serialization) and
+    skips the ~3x size blowup of indent=2; orjson, when installed, serializes
+    dict-heavy payloads ~3x faster than stdlib json and emits bytes directly.
+    """
+    if jsonl:
+        with open(path, 'wb') as f:
+            if orjson is not None:
+                for rec in records:
+                    f.write(orjson.dumps(rec) + b"\n")
+            else:
+                for rec in records:
+                    f.write(json.dumps(rec).encode() + b"\n")
+    elif orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(records, f, indent=2)
+
+
+def generate_data(jsonl=False):
     """Generate sample data for both collections."""
     # Ensure data directory exists
     os.makedirs('data', exist_ok=True)
@@ -44,9 +73,9 @@ def generate_data():
     
     # Combine and save
     all_help_data = help_samples + help_data
-    with open('data/help_support_data.json', 'w') as f:
-        json.dump(all_help_data, f, indent=2)
-    print(f"Generated {len(all_help_data)} help support documents in data/help_support_data.json")
+    help_path = 'data/help_support_data.jsonl' if jsonl else 'data/help_support_data.json'
+    write_records(help_path, all_help_data, jsonl=jsonl)
+    print(f"Generated {len(all_help_data)} help support documents in {help_path}")
     
     print("\nGenerating sample data for services collection...")
     
@@ -63,9 +92,9 @@ def generate_data():
     
     # Combine and save
     all_services_data = services_samples + services_data
-    with open('data/services_data.json', 'w') as f:
-        json.dump(all_services_data, f, indent=2)
-    print(f"Generated {len(all_services_data)} services in data/services_data.json")
+    services_path = 'data/services_data.jsonl' if jsonl else 'data/services_data.json'
+    write_records(services_path, all_services_data, jsonl=jsonl)
+    print(f"Generated {len(all_services_data)} services in {services_path}")
     
     print("\nSample data generation complete!")
     
@@ -138,14 +167,19 @@ def main():
         help="Drop existing collections before initialization"
     )
     parser.add_argument(
-        "--api", 
-        action="store_true", 
+        "--api",
+        action="store_true",
         help="Use API for ingestion instead of direct LangChain (requires running API server)"
     )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Stream output as NDJSON (.jsonl) instead of a pretty-printed JSON array"
+    )
     args = parser.parse_args()
-    
+
     # Generate the data
-    help_data, services_data = generate_data()
+    help_data, services_data = generate_data(jsonl=args.jsonl)
     
     # If ingestion is requested
     if args.ingest:
@@ -4,6 +4,7 @@ Helper script to initialize Milvus collections with langchain-milvus.
 """
 
 import os
+import sys
 import argparse
 from app.milvus_schema import init_hybrid_collection, HELP_COLLECTION, SERVICES_COLLECTION
 
@@ -18,19 +19,26 @@ def init_collections(drop_old: bool = False):
     print(f"  - Collection '{SERVICES_COLLECTION}' ready")
     print("Initialization complete!")
 
+# (label, env var, default) rows for check_environment
+ENV_ROWS = (
+    ("Milvus Host", "MILVUS_HOST", "localhost"),
+    ("Milvus Port", "MILVUS_PORT", "19530"),
+    ("Milvus URI", "MILVUS_URI", "None"),
+    ("ONNX Model Dir", "MODEL_DIR", "/models/all-MiniLM-L6-v2-onnx"),
+    ("ONNX Model Filename", "ONNX_MODEL_FILENAME", "Auto-detected"),
+    ("ONNX Provider", "ORT_PROVIDER", "AUTO"),
+    ("Embedding Dim", "EMBEDDING_DIM", "384"),
+)
+
 def check_environment():
     """Check and print environment settings."""
-    print("=== Environment Configuration ===")
-    print(f"Milvus Host: {os.getenv('MILVUS_HOST', 'localhost')}")
-    print(f"Milvus Port: {os.getenv('MILVUS_PORT', '19530')}")
-    print(f"Milvus URI: {os.getenv('MILVUS_URI', 'None')}")
-    print(f"Help Collection: {HELP_COLLECTION}")
-    print(f"Services Collection: {SERVICES_COLLECTION}")
-    print(f"ONNX Model Dir: {os.getenv('MODEL_DIR', '/models/all-MiniLM-L6-v2-onnx')}")
-    print(f"ONNX Model Filename: {os.getenv('ONNX_MODEL_FILENAME', 'Auto-detected')}")
-    print(f"ONNX Provider: {os.getenv('ORT_PROVIDER', 'AUTO')}")
-    print(f"Embedding Dim: {os.getenv('EMBEDDING_DIM', '384')}")
-    print("==============================")
+    env = os.environ
+    lines = ["=== Environment Configuration ==="]
+    lines.extend(f"{label}: {env.get(key, default)}" for label, key, default in ENV_ROWS)
+    lines.append(f"Help Collection: {HELP_COLLECTION}")
+    lines.append(f"Services Collection: {SERVICES_COLLECTION}")
+    lines.append("==============================")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     parser = argparse.ArgumentParser(description="Initialize Milvus collections for semantic search")
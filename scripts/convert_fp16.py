@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Convert the all-MiniLM-L6-v2 ONNX model to FP16 weights and activations.
+
+Halves the bytes moved through the memory-bound mean-pooling path and through
+the model itself; mainly useful on CUDA, where FP16 also enables tensor-core
+MatMul kernels. The embedder prefers model_fp16.onnx automatically when the
+quantized INT8 variant is absent.
+
+Usage:
+  python scripts/convert_fp16.py --model-dir /models/all-MiniLM-L6-v2-onnx
+"""
+
+import argparse
+import os
+
+import onnx
+from onnxruntime.transformers.float16 import convert_float_to_float16
+
+
+def convert_model(src: str, dst: str):
+    """Convert an FP32 ONNX model to FP16, keeping integer inputs intact."""
+    print(f"Converting {src} -> {dst}")
+    model = onnx.load(src)
+    model = convert_float_to_float16(model, keep_io_types=False)
+    onnx.save(model, dst)
+    print(f"Wrote {dst} ({os.path.getsize(dst) / 1e6:.1f} MB, from {os.path.getsize(src) / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create model_fp16.onnx from a FP32 ONNX model")
+    parser.add_argument("--model-dir", required=True, help="Model directory containing model.onnx; writes model_fp16.onnx next to it")
+    args = parser.parse_args()
+
+    src = os.path.join(args.model_dir, "model.onnx")
+    dst = os.path.join(args.model_dir, "model_fp16.onnx")
+    if not os.path.exists(src):
+        parser.error(f"Source model not found: {src}")
+    convert_model(src, dst)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,14 +13,60 @@ Usage:
 """
 
 import argparse
+import contextlib
+import io
 import json
+import time
+from functools import partial
 import os
 import sys
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _decode_response(resp):
+    """Decode a JSON response; orjson parses the raw bytes 2-3x faster."""
+    return orjson.loads(resp.content) if orjson is not None else resp.json()
+
+def _post_json(url, payload, timeout):
+    """POST a pre-encoded JSON body over the shared session.
+
+    Passing bytes gives requests an exact Content-Length up front (no chunked
+    transfer encoding) and skips stdlib json encoding when orjson is present.
+    """
+    if orjson is not None:
+        return SESSION.post(url, data=orjson.dumps(payload),
+                            headers={"Content-Type": "application/json"}, timeout=timeout)
+    return SESSION.post(url, json=payload, timeout=timeout)
 
 # Add the parent directory to the path so we can import from app
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
+# Import the search entry point once at module load instead of inside every
+# run_query_direct call - the first direct query otherwise stalls on model
+# import while holding the import lock, serializing concurrent workers.
+# Guarded so --api runs still work without the app dependencies installed.
+try:
+    from app.vectorstore import hybrid_search
+except ImportError:
+    hybrid_search = None
+
+# One keep-alive session for every API query - reusing the pooled connection
+# skips the TCP (and potential TLS) handshake per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=8))
+
 # Sample test queries for each collection
 DEFAULT_QUERIES = {
     "help_support": [
@@ -37,105 +83,356 @@ DEFAULT_QUERIES = {
     ]
 }
 
-def run_query_via_api(collection, query, api_url="http://localhost:8000/query"):
-    """Run a query using the API endpoint"""
-    payload = {
+# Flat (collection, query) pairs, computed once at import; the thread pool
+# and asyncio paths consume this directly instead of re-walking the dict
+TASKS = tuple(
+    (collection, query)
+    for collection, queries in DEFAULT_QUERIES.items()
+    for query in queries
+)
+
+# Fields worth shipping for display, per collection; everything else (notably
+# the raw indexed text) stays server-side
+REQUEST_FIELDS = {
+    "help_support": ["id", "title", "url", "tags", "content"],
+    "services": ["id", "name", "intent_entity", "url", "description"],
+}
+
+def _query_payload(collection, query):
+    return {
         "collection": collection,
         "query": query,
         "page": 1,
-        "page_size": 3
+        "page_size": 3,
+        # Project + truncate server-side: the client only prints 150 chars,
+        # so don't ship multi-KB articles over the wire
+        "output_fields": REQUEST_FIELDS[collection],
+        "truncate": 200,
     }
-    
-    print(f"\nQuerying {collection} via API for: '{query}'")
+
+# Per-collection display specs shared by the API and direct formatters - one
+# table lookup replaces the duplicated per-field branch chains
+FIELD_SPEC = {
+    "help_support": (("Title", "title"), ("URL", "url"), ("Tags", "tags")),
+    "services": (("Name", "name"), ("Intent", "intent_entity"), ("URL", "url")),
+}
+LONG_FIELD = {
+    "help_support": ("Content", "content"),
+    "services": ("Description", "description"),
+}
+
+# --json: one NDJSON line per result, for piping into log aggregators. Bytes
+# are written in a single buffered call under a lock, so lines never split.
+JSON_MODE = False
+_json_lock = threading.Lock()
+# Set while warmup queries run: they bypass redirect_stdout (raw buffer
+# writes), so emission itself must be muted or consumers ingest fake rows
+_json_suppressed = False
+
+def _emit_json_results(collection, query, results):
+    if _json_suppressed:
+        return
+    for rank, item in enumerate(results, 1):
+        record = {
+            "collection": collection,
+            "query": query,
+            "rank": rank,
+            "distance": item.get("distance"),
+        }
+        record.update({key: item.get(key) for key in REQUEST_FIELDS[collection]})
+        data = (orjson.dumps(record) if orjson is not None else json.dumps(record).encode()) + b"\n"
+        with _json_lock:
+            sys.__stdout__.buffer.write(data)
+    sys.__stdout__.buffer.flush()
+
+def _trunc(s, n=150):
+    """Truncate with a trailing ellipsis; one length check, slice only when needed."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+def _format_result(collection, item):
+    """Format one result dict according to the collection's field spec."""
+    lines = [f"{label}: {item.get(key, 'N/A')}" for label, key in FIELD_SPEC[collection]]
+    label, key = LONG_FIELD[collection]
+    lines.append(f"{label}: {_trunc(item.get(key) or '')}")
+    return "\n".join(lines)
+
+def _print_api_result(collection, result):
+    """Pretty-print one API query response."""
+    print(f"Found {result.get('count', 0)} results:")
+    for i, item in enumerate(result.get("results", []), 1):
+        print(f"\n--- Result {i} (distance: {item.get('distance', 'N/A')}) ---")
+        print(_format_result(collection, item))
+
+def run_query_via_api(collection, query, api_url="http://localhost:8000/query"):
+    """Run a query using the API endpoint"""
+    if not JSON_MODE:
+        print(f"\nQuerying {collection} via API for: '{query}'")
     try:
-        resp = requests.post(api_url, json=payload, timeout=10)
+        resp = _post_json(api_url, _query_payload(collection, query), timeout=10)
         resp.raise_for_status()
-        result = resp.json()
-        
-        print(f"Found {result.get('count', 0)} results:")
-        for i, item in enumerate(result.get("results", []), 1):
-            print(f"\n--- Result {i} (distance: {item.get('distance', 'N/A')}) ---")
-            if collection == "help_support":
-                print(f"Title: {item.get('title', 'N/A')}")
-                print(f"URL: {item.get('url', 'N/A')}")
-                print(f"Tags: {item.get('tags', 'N/A')}")
-                content = item.get('content', '')
-                print(f"Content: {content[:150]}..." if len(content) > 150 else f"Content: {content}")
-            else:
-                print(f"Name: {item.get('name', 'N/A')}")
-                print(f"Intent: {item.get('intent_entity', 'N/A')}")
-                print(f"URL: {item.get('url', 'N/A')}")
-                desc = item.get('description', '')
-                print(f"Description: {desc[:150]}..." if len(desc) > 150 else f"Description: {desc}")
-        
+        result = _decode_response(resp)
+        if JSON_MODE:
+            _emit_json_results(collection, query, result.get("results", []))
+        else:
+            _print_api_result(collection, result)
         return True
     except Exception as e:
         print(f"Error running query via API: {e}")
         return False
 
+def run_queries_via_api_batch(collection, queries, api_url="http://localhost:8000/query"):
+    """Send every query for a collection in one POST to the batch endpoint.
+
+    One TCP round-trip and one server-side embedding batch instead of one of
+    each per query; results come back as a list per query, in order.
+    """
+    payload = {"collection": collection, "queries": list(queries), "page_size": 3}
+    batch_url = api_url.rstrip("/") + "/batch"
+    if not JSON_MODE:
+        print(f"\nBatch querying {collection} via API for {len(queries)} queries")
+    try:
+        resp = _post_json(batch_url, payload, timeout=30)
+        resp.raise_for_status()
+        result = _decode_response(resp)
+        for query, hits in zip(queries, result.get("results", [])):
+            if JSON_MODE:
+                _emit_json_results(collection, query, hits)
+                continue
+            print(f"\nQuerying {collection} via API for: '{query}'")
+            _print_api_result(collection, {"count": len(hits), "results": hits})
+            print("\n" + "-" * 50)
+        return True
+    except Exception as e:
+        print(f"Error running batch query via API: {e}",
+              file=sys.stderr if JSON_MODE else sys.stdout)
+        return False
+
+async def run_query_via_api_async(client, collection, query, api_url):
+    """Async variant of run_query_via_api sharing one httpx connection pool."""
+    try:
+        resp = await client.post(api_url, json=_query_payload(collection, query), timeout=10)
+        resp.raise_for_status()
+        result = _decode_response(resp)
+    except Exception as e:
+        if JSON_MODE:
+            print(f"Error running query via API for '{query}': {e}", file=sys.stderr)
+        else:
+            print(f"\nQuerying {collection} via API for: '{query}'")
+            print(f"Error running query via API: {e}")
+            print("\n" + "-" * 50)
+        return False
+    if JSON_MODE:
+        _emit_json_results(collection, query, result.get("results", []))
+        return True
+    # No awaits below, so each block prints atomically on the event loop
+    print(f"\nQuerying {collection} via API for: '{query}'")
+    _print_api_result(collection, result)
+    print("\n" + "-" * 50)
+    return True
+
+def run_queries_async(tasks, api_url):
+    """Fire all API queries concurrently on one event loop via httpx."""
+    import asyncio
+
+    async def go():
+        async with httpx.AsyncClient() as client:
+            return await asyncio.gather(*[
+                run_query_via_api_async(client, collection, query, api_url)
+                for collection, query in tasks
+            ])
+
+    return asyncio.run(go())
+
+# Semantic cache for direct queries - repeated/paraphrased dev queries skip
+# the ANN search on hit (built lazily so --api runs never import app.*)
+_semantic_cache = None
+
+def _get_semantic_cache():
+    global _semantic_cache
+    if _semantic_cache is None:
+        from app.semantic_cache import SemanticCache
+        _semantic_cache = SemanticCache(capacity=256, tau=0.92)
+    return _semantic_cache
+
+
+def warmup_direct():
+    """Force the embedding model load once, before concurrent workers start."""
+    from app.vectorstore import get_embeddings
+    get_embeddings().embed_query("warmup")
+
+
 def run_query_direct(collection, query):
-    """Run a query using direct LangChain access"""
-    from app.vectorstore import similarity_search
-    
-    print(f"\nQuerying {collection} directly for: '{query}'")
+    """Run a query directly against Milvus via app.vectorstore"""
+    if hybrid_search is None:
+        print("Error: app.vectorstore could not be imported (install the app dependencies)")
+        return False
+
+    if not JSON_MODE:
+        print(f"\nQuerying {collection} directly for: '{query}'")
     try:
-        results = similarity_search(collection, query, k=3)
-        
+        from app.vectorstore import distances_array
+
+        cache = _get_semantic_cache()
+        results = cache.get(collection, query)
+        if results is None:
+            results = hybrid_search(collection, query, k=3)
+            cache.put(collection, query, results)
+        # One bulk array instead of a reflective per-result lookup; also what
+        # client-side re-ranking (app.rerank) would consume
+        distances = distances_array(results)
+
+        if JSON_MODE:
+            _emit_json_results(collection, query, results)
+            return True
+
         print(f"Found {len(results)} results:")
-        for i, doc in enumerate(results, 1):
-            metadata = doc.metadata
-            distance = getattr(doc, 'distance', 'N/A')
-            
-            print(f"\n--- Result {i} (distance: {distance}) ---")
-            if collection == "help_support":
-                print(f"Title: {metadata.get('title', 'N/A')}")
-                print(f"URL: {metadata.get('url', 'N/A')}")
-                print(f"Tags: {metadata.get('tags', 'N/A')}")
-                content = metadata.get('content', '')
-                print(f"Content: {content[:150]}..." if len(content) > 150 else f"Content: {content}")
-            else:
-                print(f"Name: {metadata.get('name', 'N/A')}")
-                print(f"Intent: {metadata.get('intent_entity', 'N/A')}")
-                print(f"URL: {metadata.get('url', 'N/A')}")
-                desc = metadata.get('description', '')
-                print(f"Description: {desc[:150]}..." if len(desc) > 150 else f"Description: {desc}")
-        
+        for i, (hit, distance) in enumerate(zip(results, distances), 1):
+            print(f"\n--- Result {i} (distance: {distance:.6g}) ---")
+            print(_format_result(collection, hit))
+
         return True
     except Exception as e:
         print(f"Error running direct query: {e}")
         return False
 
+class ThreadBufferedOutput(io.TextIOBase):
+    """stdout proxy that groups each worker thread's prints into one block.
+
+    Threads that called begin() write into a private buffer collected by
+    end(); anything else passes straight through, so output from concurrent
+    queries never interleaves mid-result.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self._buffers = threading.local()
+
+    def begin(self):
+        self._buffers.buf = io.StringIO()
+
+    def end(self) -> str:
+        block = self._buffers.buf.getvalue()
+        self._buffers.buf = None
+        return block
+
+    def write(self, s):
+        buf = getattr(self._buffers, "buf", None)
+        if buf is None:
+            return self.target.write(s)
+        return buf.write(s)
+
+    def flush(self):
+        self.target.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run test queries against the semantic search service")
     parser.add_argument("--api", action="store_true", help="Use the API endpoint instead of direct LangChain")
     parser.add_argument("--query", help="Specific query to run")
     parser.add_argument("--collection", choices=["help_support", "services"], help="Collection to query against")
     parser.add_argument("--api-url", default="http://localhost:8000/query", help="API URL for queries")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Drive API queries with asyncio + httpx instead of threads")
+    parser.add_argument("--batch", action="store_true",
+                        help="Send all queries per collection in one POST to /query/batch")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Throwaway queries per collection before the timed run (0 disables)")
+    parser.add_argument("--json", action="store_true",
+                        help="Emit one NDJSON line per result instead of pretty output")
     args = parser.parse_args()
-    
+
+    global JSON_MODE
+    JSON_MODE = args.json
+
+    # Bind the API/direct decision once instead of re-branching per query
+    runner = partial(run_query_via_api, api_url=args.api_url) if args.api else run_query_direct
+
     # If specific query is provided, run only that
     if args.query:
         if not args.collection:
             print("Error: When providing a query, you must specify a collection with --collection")
             sys.exit(1)
-            
-        if args.api:
-            run_query_via_api(args.collection, args.query, args.api_url)
-        else:
-            run_query_direct(args.collection, args.query)
+
+        runner(args.collection, args.query)
         return
     
-    # Otherwise run the default test queries
-    print("Running test queries...")
-    for collection, queries in DEFAULT_QUERIES.items():
-        for query in queries:
-            if args.api:
-                run_query_via_api(collection, query, args.api_url)
-            else:
-                run_query_direct(collection, query)
-            print("\n" + "-"*50)
-    
-    print("\nTest queries complete!")
+    # Otherwise run the default test queries concurrently - each query is
+    # I/O-bound on the service, so total wall time approaches max(latency)
+    # rather than sum(latency). In JSON mode status lines go to stderr so
+    # stdout stays pure NDJSON.
+    status_out = sys.stderr if JSON_MODE else sys.stdout
+    print("Running test queries...", file=status_out)
+    tasks = TASKS
+
+    # Batched path: one POST per collection to /query/batch
+    if args.batch and args.api:
+        for collection, queries in DEFAULT_QUERIES.items():
+            run_queries_via_api_batch(collection, queries, args.api_url)
+        print("\nTest queries complete!", file=status_out)
+        return
+
+    # asyncio path: same concurrency as the thread pool without a thread per
+    # idle socket; requires httpx and only applies to the API mode
+    if args.use_async and args.api:
+        if httpx is None:
+            print("Error: --async requires the httpx package", file=sys.stderr)
+            sys.exit(1)
+        run_queries_async(tasks, args.api_url)
+        print("\nTest queries complete!", file=status_out)
+        return
+
+    # Warmup: pay model load / index mmap / first-query cost before timing so
+    # the aggregate latencies below reflect steady state
+    if args.warmup > 0:
+        global _json_suppressed
+        _json_suppressed = True
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(args.warmup):
+                    for collection in DEFAULT_QUERIES:
+                        runner(collection, "warmup")
+        finally:
+            _json_suppressed = False
+    elif not args.api:
+        warmup_direct()
+
+    proxy = ThreadBufferedOutput(sys.stdout)
+    print_lock = threading.Lock()
+    latencies = []
+
+    def run_task(collection, query):
+        proxy.begin()
+        started = time.perf_counter()
+        try:
+            runner(collection, query)
+        finally:
+            elapsed = time.perf_counter() - started
+            block = proxy.end()
+            with print_lock:
+                latencies.append(elapsed)
+                if not JSON_MODE:
+                    proxy.target.write(block + "\n" + "-" * 50 + "\n")
+                elif block.strip():
+                    # In JSON mode the runners only print errors; surface them
+                    # on stderr instead of silently dropping the block
+                    sys.stderr.write(block if block.endswith("\n") else block + "\n")
+
+    original_stdout = sys.stdout
+    sys.stdout = proxy
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda task: run_task(*task), tasks))
+    finally:
+        sys.stdout = original_stdout
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"\n{len(latencies)} queries in {wall * 1000:.0f} ms wall "
+          f"(p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms)", file=status_out)
+    print("\nTest queries complete!", file=status_out)
 
 if __name__ == "__main__":
     main()